@@ -1,7 +1,13 @@
+import os
 import sys
 import sqlite3
 import pandas as pd
 
+try:
+    import duckdb
+except ImportError:
+    duckdb = None
+
 # ==========================================================================================
 # ==========================================================================================
 
@@ -24,14 +30,32 @@ class ReadExcel:
 
     This class loads an Excel spreadsheet containing monthly primary energy
     production values, renames relevant columns, standardizes missing values,
-    and converts data types as needed.
+    and converts data types as needed. The cleaned data is cached as a Parquet
+    file next to the Excel file and reused until the Excel file changes.
 
     Attributes
     ----------
     df_subset : pd.DataFrame
         A cleaned and remapped subset of the Excel data with standardized column names
         and all numeric values converted to floats. The 'Date' column is preserved.
+    cache_name : str
+        Path to the Parquet cache of df_subset.
     """
+    DATE_COLUMN = "Month"
+    COLUMNS_MAPPING = {
+        "Coal Production": "Coal",
+        "Natural Gas (Dry) Production": "GasDry",
+        "Natural Gas Plant Liquids Production": "GasLiquid",
+        "Crude Oil Production": "CrudeOil",
+        "Nuclear Electric Power Production": "Nuclear",
+        "Hydroelectric Power Production": "Hydro",
+        "Geothermal Energy Production": "Geothermal",
+        "Solar Energy Production": "Solar",
+        "Wind Energy Production": "Wind",
+        "Biomass Energy Production": "Biomass"
+    }
+    NA_VALUES = ["Not Available", "--", "NA"]
+
     def __init__(self, file_name: str):
         """
         Initialize the ReadExcel object by reading and transforming the Excel file.
@@ -41,8 +65,33 @@ class ReadExcel:
         file_name : str
             Path to the Excel file to be read.
         """
-        df = self._read_excel_file(file_name)
-        self.df_subset = self._remap_dataFrame(df)
+        self.cache_name = os.path.splitext(file_name)[0] + ".parquet"
+        if self._cache_is_current(file_name):
+            self.df_subset = pd.read_parquet(self.cache_name)
+        else:
+            df = self._read_excel_file(file_name)
+            self.df_subset = self._remap_dataFrame(df)
+            self.df_subset.to_parquet(self.cache_name, index=False)
+
+# ------------------------------------------------------------------------------------------ 
+
+    def _cache_is_current(self, file_name: str) -> bool:
+        """
+        Check whether the Parquet cache exists and is at least as new as the Excel file.
+
+        Parameters
+        ----------
+        file_name : str
+            Path to the Excel file.
+
+        Returns
+        -------
+        bool
+            True if the cache can be used in place of reading the Excel file.
+        """
+        if not (os.path.exists(self.cache_name) and os.path.exists(file_name)):
+            return False
+        return os.path.getmtime(self.cache_name) >= os.path.getmtime(file_name)
 
 # ------------------------------------------------------------------------------------------ 
 
@@ -51,7 +100,12 @@ class ReadExcel:
         Read the raw Excel file and extract the relevant header and data rows.
 
         Assumes that the column headers are located at row 10 and the units
-        row at 11 is skipped. The first column is renamed to 'Date'.
+        row at 11 is skipped. Only the date column and the energy columns in
+        COLUMNS_MAPPING are read; the date column is parsed as a datetime and
+        the energy columns are read directly as floats, with placeholders such
+        as 'Not Available' read as NaN. The first column is renamed to 'Date'.
+        The workbook is parsed with the Rust-backed calamine engine, which needs
+        the python-calamine package and pandas 2.2 or newer.
 
         Parameters
         ----------
@@ -61,11 +115,21 @@ class ReadExcel:
         Returns
         -------
         pd.DataFrame
-            A raw DataFrame containing the full dataset with the first column
-            renamed to 'Date'. Exits the program if the file is not found.
+            A raw DataFrame containing the date and energy columns with the first
+            column renamed to 'Date'. Exits the program if the file is not found.
         """
         try:
-            df = pd.read_excel(file_name, sheet_name=0, skiprows=[11], header=10)
+            df = pd.read_excel(
+                file_name,
+                sheet_name=0,
+                skiprows=[11],
+                header=10,
+                engine="calamine",
+                usecols=[self.DATE_COLUMN] + list(self.COLUMNS_MAPPING.keys()),
+                dtype={col: "float64" for col in self.COLUMNS_MAPPING},
+                na_values=self.NA_VALUES,
+                parse_dates=[self.DATE_COLUMN]
+            )
             df = df.rename(columns={df.columns[0]: "Date"})
             return df
         except FileNotFoundError:
@@ -79,8 +143,8 @@ class ReadExcel:
         """
         Extract and clean a subset of energy source columns from the full DataFrame.
 
-        Renames columns to simplified labels, replaces non-numeric values (e.g. 
-        'Not Available') with 0.0, and ensures all values are floats.
+        Renames columns to simplified labels and replaces missing values (e.g.
+        'Not Available', read as NaN) with 0.0.
 
         Parameters
         ----------
@@ -92,24 +156,11 @@ class ReadExcel:
         pd.DataFrame
             A cleaned DataFrame with standardized column names and numeric values.
         """
-        columns_mapping = {
-            "Coal Production": "Coal",
-            "Natural Gas (Dry) Production": "GasDry",
-            "Natural Gas Plant Liquids Production": "GasLiquid",
-            "Crude Oil Production": "CrudeOil",
-            "Nuclear Electric Power Production": "Nuclear",
-            "Hydroelectric Power Production": "Hydro",
-            "Geothermal Energy Production": "Geothermal",
-            "Solar Energy Production": "Solar",
-            "Wind Energy Production": "Wind",
-            "Biomass Energy Production": "Biomass"
-        }
-        df_subset = data_frame[["Date"] + list(columns_mapping.keys())]
-        df_subset = df_subset.rename(columns=columns_mapping)
-
-        for col in df_subset.columns:
-            if col != "Date":
-                df_subset[col] = pd.to_numeric(df_subset[col], errors="coerce").fillna(0.0)
+        df_subset = data_frame[["Date"] + list(self.COLUMNS_MAPPING.keys())]
+        df_subset = df_subset.rename(columns=self.COLUMNS_MAPPING)
+
+        # Values are already floats from read_excel, only the gaps need filling
+        df_subset = df_subset.fillna(0.0)
         return df_subset
 
 
@@ -121,7 +172,7 @@ class UpdateSQLite(ReadExcel):
     """
     A class that extends ReadExcel to update a SQLite database with energy production data.
 
-    This class connects to a SQLite database, drops any existing 'Mix' table,
+    This class connects to a SQLite database, drops any existing 'EnergyMix' table,
     creates a new one with standardized schema, and populates it using the
     cleaned data from the ReadExcel parent class.
 
@@ -149,6 +200,7 @@ class UpdateSQLite(ReadExcel):
         self.db_name = db_name 
         self.conn = sqlite3.connect(self.db_name)
         self.cursor = self.conn.cursor()
+        self._set_pragmas()
 
         self._drop_table()
         self._create_newTable()
@@ -159,16 +211,30 @@ class UpdateSQLite(ReadExcel):
 
 # ------------------------------------------------------------------------------------------
 
+    def _set_pragmas(self) -> None:
+        """
+        Tune the SQLite connection for a bulk load.
+
+        The table is dropped and rebuilt on every run, so durability is traded for
+        speed: no fsync on commit, an in-memory journal and temp store, and a 64 MB
+        page cache.
+        """
+        self.cursor.execute("PRAGMA synchronous=OFF")
+        self.cursor.execute("PRAGMA journal_mode=MEMORY")
+        self.cursor.execute("PRAGMA temp_store=MEMORY")
+        self.cursor.execute("PRAGMA cache_size=-64000")
+# ------------------------------------------------------------------------------------------ 
+
     def _drop_table(self) -> None:
         """
-        Drop the 'Mix' table from the SQLite database if it exists.
+        Drop the 'EnergyMix' table from the SQLite database if it exists.
         """
-        self.cursor.execute("DROP TABLE IF EXISTS Mix")
+        self.cursor.execute("DROP TABLE IF EXISTS EnergyMix")
 # ------------------------------------------------------------------------------------------ 
 
     def _create_newTable(self) -> None:
         """
-        Create a new 'Mix' table in the SQLite database with columns for
+        Create a new 'EnergyMix' table in the SQLite database with columns for
         energy production by source, including a primary key 'Date' column.
         """
         self.cursor.execute("""
@@ -190,21 +256,88 @@ class UpdateSQLite(ReadExcel):
 
     def _insert_data(self) -> None:
         """
-        Insert the cleaned energy data into the 'Mix' table of the SQLite database.
+        Insert the cleaned energy data into the 'EnergyMix' table of the SQLite database.
 
         This method uses the df_subset attribute inherited from ReadExcel and
-        writes it to the SQLite database using Pandas' to_sql method.
+        writes it to the SQLite database with a single executemany call. Dates
+        are stored as ISO 'YYYY-MM-DD' strings.
         """
         if self.df_subset is not None:
-            self.df_subset.to_sql("EnergyMix", self.conn, if_exists="append", index=False)
+            # Stringify dates in one vectorized call, then stream plain tuples to sqlite
+            df = self.df_subset.assign(Date=self.df_subset["Date"].dt.strftime("%Y-%m-%d"))
+            rows = df.itertuples(index=False, name=None)
+            columns = ", ".join(df.columns)
+            placeholders = ", ".join("?" * len(df.columns))
+            self.cursor.executemany(
+                f"INSERT INTO EnergyMix ({columns}) VALUES ({placeholders})", rows
+            )
             print("SQLite table 'EnergyMix' updated successfully.")
 
 # ========================================================================================== 
 # ========================================================================================== 
 
 
+class UpdateDuckDB(ReadExcel):
+    """
+    A class that extends ReadExcel to write energy production data to a DuckDB database.
+
+    This is a columnar alternative to UpdateSQLite. The cleaned DataFrame from the
+    ReadExcel parent class is registered with DuckDB and the 'EnergyMix' table is
+    replaced in a single CREATE OR REPLACE TABLE ... AS SELECT statement, so no rows
+    pass through Python. Requires the optional duckdb package.
+
+    Attributes
+    ----------
+    db_name : str
+        Name of the DuckDB database file.
+    conn : duckdb.DuckDBPyConnection
+        DuckDB connection object.
+    """
+    def __init__(self, file_name: str, db_name: str = "Energy.duckdb"):
+        """
+        Initialize the UpdateDuckDB object and populate the database.
+
+        Parameters
+        ----------
+        file_name : str
+            Path to the Excel file to be read and processed.
+        db_name : str, optional
+            Name of the DuckDB database file to create or update (default is "Energy.duckdb").
+        """
+        if duckdb is None:
+            print("Error: The duckdb package is required to create a DuckDB database.")
+            sys.exit(1)
+        super().__init__(file_name)
+        self.db_name = db_name
+        self.conn = duckdb.connect(self.db_name)
+
+        self._replace_table()
+
+        self.conn.close()
+
+# ------------------------------------------------------------------------------------------ 
+
+    def _replace_table(self) -> None:
+        """
+        Replace the 'EnergyMix' table in the DuckDB database with the cleaned energy data.
+
+        The df_subset attribute inherited from ReadExcel is registered as a view and
+        copied into the table by DuckDB's vectorized engine.
+        """
+        if self.df_subset is not None:
+            self.conn.register("df_subset", self.df_subset)
+            self.conn.execute("CREATE OR REPLACE TABLE EnergyMix AS SELECT * FROM df_subset")
+            self.conn.unregister("df_subset")
+            print("DuckDB table 'EnergyMix' updated successfully.")
+
+# ========================================================================================== 
+# ========================================================================================== 
+
+
 def main() -> None:
     UpdateSQLite("Mix.xlsx")    
+    if duckdb is not None:
+        UpdateDuckDB("Mix.xlsx")
 
 # ========================================================================================== 
 # ========================================================================================== 
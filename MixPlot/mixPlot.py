@@ -2,7 +2,14 @@ import dash
 from dash import dcc, html, Input, Output
 import plotly.graph_objs as go
 import pandas as pd
+import numpy as np
 import sqlite3
+import os
+
+try:
+    import duckdb
+except ImportError:
+    duckdb = None
 
 # ==========================================================================================
 # ==========================================================================================
@@ -13,32 +20,162 @@ import sqlite3
 # Purpose: Creates an energy dashboard with the folowing plots 
 #          - Energy production / energy fraction from 1973 to present by technology
 
+# ==========================================================================================
+# ==========================================================================================
+# Figure layouts
+
+def energy_layout(y_label):
+    """
+    Build the layout used by the energy production line plot.
+
+    Parameters
+    ----------
+    y_label : str
+        Title of the y axis.
+
+    Returns
+    -------
+    go.Layout
+        The styled layout for the energy production plot.
+    """
+    return go.Layout(
+        xaxis=dict(
+            title=dict(text="Date", font=dict(size=26, family="Roboto", color="#333")),
+            tickfont=dict(size=14),
+            gridcolor="lightgray",
+            gridwidth=1,
+            zeroline=False
+        ),
+        yaxis=dict(
+            title=dict(text=y_label, font=dict(size=26, family="Roboto", color="#333")),
+            tickfont=dict(size=14),
+            gridcolor="lightgray",
+            gridwidth=1,
+            zeroline=False
+        ),
+
+        legend=dict(
+            font=dict(size=13),
+            bgcolor="rgba(255,255,255,0.8)",
+            bordercolor="lightgray",
+            borderwidth=1
+        ),
+        hovermode="x unified",
+        hoverlabel=dict(
+            font=dict(size=14),
+            namelength=-1
+        ),
+        margin=dict(t=60, b=60, l=80, r=40),
+        plot_bgcolor="#ffffff",
+        paper_bgcolor="#ffffff"
+    )
+
+# ------------------------------------------------------------------------------------------ 
+
+def grouped_layout(y_label):
+    """
+    Build the layout used by the grouped energy production line plot.
+
+    Parameters
+    ----------
+    y_label : str
+        Title of the y axis.
+
+    Returns
+    -------
+    go.Layout
+        The styled layout for the grouped energy production plot.
+    """
+    return go.Layout(
+        #title=f"{'Annual' if time_res == 'annual' else 'Monthly'} Grouped Energy Production ({'%' if view_type == 'percent' else 'Quadrillion Btu'})",
+        title=dict(font=dict(size=26, family="Roboto", color="#333")),
+        plot_bgcolor="#ffffff",
+        paper_bgcolor="#ffffff",
+        margin=dict(t=40, b=40, l=60, r=20),
+        legend=dict(
+            font=dict(size=13),
+            bgcolor="rgba(255,255,255,0.8)",
+            bordercolor="lightgray",
+            borderwidth=1
+        ),
+        hovermode="x unified",
+        xaxis=dict(
+            title=dict(text="Date", font=dict(size=26, family="Roboto", color="#333")),
+            tickfont=dict(size=14, family="Roboto")
+        ),
+        yaxis=dict(
+            title=dict(text=y_label, font=dict(size=26, family="Roboto", color="#333")),
+            tickfont=dict(size=14, family="Roboto")
+        )
+    )
+
+# ------------------------------------------------------------------------------------------ 
+
+# The layouts never change between callbacks, so build one per value type up front
+ENERGY_LAYOUTS = {
+    "raw": energy_layout("Quadrillion Btu"),
+    "percent": energy_layout("% of Total Mix")
+}
+GROUPED_LAYOUTS = {
+    "raw": grouped_layout("Quadrillion Btu"),
+    "percent": grouped_layout("% of Mix")
+}
+
+# Pie chart categories and the energy columns summed into each
+PIE_CATEGORIES = {
+    "Gas": ["GasDry", "GasLiquid"],
+    "Coal": ["Coal"],
+    "Nuclear": ["Nuclear"],
+    "Wind": ["Wind"],
+    "Solar": ["Solar"],
+    "All Others": ["Hydro", "Geothermal", "Biomass"]
+}
+
 # ==========================================================================================
 # ==========================================================================================
 # Relevant Functions
 
 def load_data():
     """
-    Load energy production data from a SQLite database and return it as a DataFrame.
-
-    The function reads from the 'EnergyMix' table in the local 'Energy.db' SQLite
-    database. It parses the 'Date' column as datetime and drops the 'CrudeOil' column,
-    as crude oil is not typically used for electricity generation.
+    Load energy production data and return it as a DataFrame.
+
+    If the Parquet snapshot 'Mix.parquet' written by createDB.py is present it is
+    read directly, since it already stores typed columns. Next, if a local
+    'Energy.duckdb' database exists and duckdb is installed, its 'EnergyMix' table
+    is fetched as a DataFrame. Otherwise the function reads from the 'EnergyMix'
+    table in the local 'Energy.db' SQLite database and parses the 'Date' column as
+    datetime. The 'CrudeOil' column is dropped, as
+    crude oil is not typically used for electricity generation, and an int16
+    'Year' column is added so callbacks do not have to decode 'Date' again.
+    Energy values are downcast to float32, which is ample for the precision of
+    the source data and halves the memory each aggregation has to touch.
 
     Returns
     -------
     pd.DataFrame
         A DataFrame containing monthly energy production data by source,
-        with 'Date' as a datetime column and 'CrudeOil' excluded.
+        with 'Date' as a datetime column, a 'Year' column, float32 energy values
+        and 'CrudeOil' excluded.
     """
-    conn = sqlite3.connect("Energy.db")
-    df = pd.read_sql_query("SELECT * FROM EnergyMix", conn, parse_dates=["Date"])
-    conn.close()
+    if os.path.exists("Mix.parquet"):
+        df = pd.read_parquet("Mix.parquet")
+    elif duckdb is not None and os.path.exists("Energy.duckdb"):
+        conn = duckdb.connect("Energy.duckdb", read_only=True)
+        df = conn.execute("SELECT * FROM EnergyMix").df()
+        conn.close()
+    else:
+        conn = sqlite3.connect("Energy.db")
+        df = pd.read_sql_query("SELECT * FROM EnergyMix", conn, parse_dates=["Date"])
+        conn.close()
 
     # Drop crude oil column — it's not relevant for electricity
     if "CrudeOil" in df.columns:
         df = df.drop(columns=["CrudeOil"])
 
+    float_cols = df.select_dtypes(include="float64").columns
+    df[float_cols] = df[float_cols].astype("float32")
+
+    df["Year"] = df["Date"].dt.year.astype("int16")
     return df
 
 # ------------------------------------------------------------------------------------------ 
@@ -47,25 +184,32 @@ def aggregate_annual(df):
     """
     Aggregate monthly energy production data into annual totals.
 
-    This function groups the data by year, sums the numeric columns (energy values),
-    and returns a new DataFrame with a datetime 'Date' column representing the start
-    of each year.
+    This function resamples the data on its 'Date' column to year-start bins, sums
+    the numeric columns (energy values), and returns a new DataFrame with a datetime
+    'Date' column representing the start of each year. The input DataFrame is not
+    modified.
 
     Parameters
     ----------
     df : pd.DataFrame
-        The input DataFrame with a 'Date' column and monthly energy data.
+        The input DataFrame with 'Date' and 'Year' columns and monthly energy data.
 
     Returns
     -------
     pd.DataFrame
         A new DataFrame aggregated by year, with 'Date' representing January 1st
-        of each year and numeric values representing annual totals.
+        of each year, a matching 'Year' column, and numeric values representing
+        annual totals.
     """
-    df["Year"] = df["Date"].dt.year
-    df_annual = df.groupby("Year").sum(numeric_only=True).reset_index()
-    df_annual["Date"] = pd.to_datetime(df_annual["Year"], format="%Y")
-    return df_annual.drop(columns=["Year"])
+    df_annual = (
+        df.drop(columns=["Year"])
+        .set_index("Date")
+        .resample("YS")
+        .sum(numeric_only=True)
+        .reset_index()
+    )
+    df_annual["Year"] = df_annual["Date"].dt.year.astype("int16")
+    return df_annual
 
 # ------------------------------------------------------------------------------------------ 
 
@@ -74,22 +218,36 @@ def percent_mix(df):
     Convert absolute energy values to percentage share of total production for each time period.
 
     For each row (e.g., each month or year), this function computes the total energy production
-    and converts each energy source to its percentage contribution to that total.
+    and converts each energy source to its percentage contribution to that total. The work is
+    done as a single NumPy broadcast over the numeric block; rows with no production are left
+    at zero.
 
     Parameters
     ----------
     df : pd.DataFrame
-        The input DataFrame with numeric energy source columns and a 'Date' column.
+        The input DataFrame with float energy source columns, a 'Date' column and
+        an integer 'Year' column.
 
     Returns
     -------
     pd.DataFrame
-        A DataFrame where each numeric column represents the percentage share of
+        A DataFrame where each float column represents the percentage share of
         the total energy mix for that period (row).
     """
-    numeric_cols = df.select_dtypes(include="number").columns
-    totals = df[numeric_cols].sum(axis=1)
-    return df.assign(**{col: df[col] / totals * 100 for col in numeric_cols})
+    numeric_cols = df.select_dtypes(include="float").columns
+    # pandas hands back a column-major block; copy it row-major so each row sum reads
+    # contiguous memory
+    values = np.array(df[numeric_cols].to_numpy(), order="C")
+    totals = values.sum(axis=1, keepdims=True)
+
+    # Fold the divide and the scaling into one per-row factor so the block is only swept once
+    scale = np.zeros_like(totals)
+    np.divide(100.0, totals, out=scale, where=totals != 0)
+    values *= scale
+
+    df_pct = df.copy()
+    df_pct[numeric_cols] = values
+    return df_pct
 
 # ========================================================================================== 
 # ========================================================================================== 
@@ -97,10 +255,21 @@ def percent_mix(df):
 
 def create_app():
     df_full = load_data()
-    energy_sources = df_full.columns.drop("Date")
-    min_year = df_full["Date"].dt.year.min()
-    max_year = df_full["Date"].dt.year.max()
+    energy_sources = df_full.columns.drop(["Date", "Year"])
+    years = df_full["Year"].to_numpy()
+    min_year, max_year = int(years.min()), int(years.max())
     year_marks = {year: str(year) for year in range(min_year, max_year + 1, 2)}
+    pie_year_marks = {year: str(year) for year in range(min_year, max_year + 1, 5)}
+
+    # Only four views of the data exist, so build each once rather than per callback.
+    # They are shared by every callback for the life of the app and must not be modified.
+    df_annual = aggregate_annual(df_full)
+    frames = {
+        ("monthly", "raw"): df_full,
+        ("monthly", "percent"): percent_mix(df_full),
+        ("annual", "raw"): df_annual,
+        ("annual", "percent"): percent_mix(df_annual)
+    }
 
     app = dash.Dash(__name__)
     app.title = "Energy Mix Dashboard"
@@ -175,7 +344,7 @@ def create_app():
                     max=max_year,
                     step=1,
                     value=max_year,
-                    marks={year: str(year) for year in range(min_year, max_year + 1, 5)},
+                    marks=pie_year_marks,
                     vertical=True,
                     tooltip={"always_visible": True}
                 )
@@ -199,6 +368,7 @@ def create_app():
 
     # Store full data and config in the app for use in callbacks
     app.df_full = df_full
+    app.frames = frames
     app.energy_sources = energy_sources
 
     return app, min_year, max_year, year_marks
@@ -217,75 +387,30 @@ def update_plot(sources, time_res, view_type, year_range):
     if not sources:
         return go.Figure()
 
-    df = app.df_full.copy()
+    df = app.frames[(time_res, view_type)]
 
     start_year, end_year = year_range
-    df = df[(df["Date"].dt.year >= start_year) & (df["Date"].dt.year <= end_year)]
-
-    if time_res == "annual":
-        df = aggregate_annual(df)
+    mask = df["Year"].between(start_year, end_year)
+    df = df.loc[mask, ["Date", *sources]]
 
-    if view_type == "percent":
-        df = percent_mix(df)
+    hover_suffix = "%" if view_type == "percent" else ""
 
-    if time_res == "annual":
-        df = aggregate_annual(df)
+    # Hand Plotly contiguous arrays so it can skip converting Series element by element
+    x = df["Date"].to_numpy()
+    ys = {col: df[col].to_numpy() for col in sources}
 
-    if view_type == "percent":
-        df = percent_mix(df)
-
-    fig = go.Figure()
-    hover_format = ".2f" if view_type == "raw" else ".2f%%"
-    for col in sources:
-        if view_type == "percent":
-            hovertemplate = f"{col}: %{{y:.2f}}%<extra></extra>"
-        else:
-            hovertemplate = f"{col}: %{{y:.2f}}<extra></extra>"
-
-        fig.add_trace(go.Scatter(
-            x=df["Date"],
-            y=df[col],
+    traces = [
+        go.Scatter(
+            x=x,
+            y=ys[col],
             mode="lines",
             name=col,
             line=dict(width=3),
-            hovertemplate=hovertemplate
-        ))
-    
-    y_label = "% of Total Mix" if view_type == "percent" else "Quadrillion Btu"
-    fig.update_layout(
-        xaxis_title="Date",
-        yaxis_title=f"{y_label}",
-
-        xaxis=dict(
-            title_font=dict(size=26, family="Roboto", color="#333"),
-            tickfont=dict(size=14),
-            gridcolor="lightgray",
-            gridwidth=1,
-            zeroline=False
-        ),
-        yaxis=dict(
-            title_font=dict(size=26, family="Roboto", color="#333"),
-            tickfont=dict(size=14),
-            gridcolor="lightgray",
-            gridwidth=1,
-            zeroline=False
-        ),
-
-        legend=dict(
-            font=dict(size=13),
-            bgcolor="rgba(255,255,255,0.8)",
-            bordercolor="lightgray",
-            borderwidth=1
-        ),
-        hovermode="x unified",
-        hoverlabel=dict(
-            font=dict(size=14),
-            namelength=-1
-        ),
-        margin=dict(t=60, b=60, l=80, r=40),
-        plot_bgcolor="#ffffff",
-        paper_bgcolor="#ffffff"
-    )
+            hovertemplate=f"{col}: %{{y:.2f}}{hover_suffix}<extra></extra>"
+        )
+        for col in sources
+    ]
+    fig = go.Figure(data=traces, layout=ENERGY_LAYOUTS[view_type])
 
     return fig
 
@@ -296,33 +421,17 @@ def update_plot(sources, time_res, view_type, year_range):
     Input("pie-year-slider", "value")
 )
 def update_pie(selected_year):
-    df = app.df_full.copy()
-    df["Year"] = df["Date"].dt.year
-
-    # Filter to selected year
-    df_year = df[df["Year"] == selected_year]
-
-    # Aggregate total by column
-    totals = df_year.drop(columns=["Date", "Year"]).sum()
-
-    # Define categories
-    pie_data = {
-        "Gas": totals.get("GasDry", 0) + totals.get("GasLiquid", 0),
-        "Coal": totals.get("Coal", 0),
-        "Nuclear": totals.get("Nuclear", 0),
-        "Wind": totals.get("Wind", 0),
-        "Solar": totals.get("Solar", 0),
-        "All Others": (
-            totals.get("Hydro", 0) +
-            totals.get("Geothermal", 0) +
-            totals.get("Biomass", 0)
-        )
-    }
+    # The annual totals are precomputed, so the selected year is a single row
+    df_annual = app.frames[("annual", "raw")]
+    df_year = df_annual[df_annual["Year"] == selected_year]
+
+    # Aggregate total by category
+    values = [float(df_year[cols].to_numpy().sum()) for cols in PIE_CATEGORIES.values()]
 
     fig = go.Figure(data=[
         go.Pie(
-            labels=list(pie_data.keys()),
-            values=list(pie_data.values()),
+            labels=list(PIE_CATEGORIES),
+            values=values,
             hole=0.4,
             textinfo="label+percent",
             marker=dict(line=dict(color="white", width=2))
@@ -345,60 +454,36 @@ def update_pie(selected_year):
     Input("year-slider", "value")
 )
 def update_grouped_plot(time_res, view_type, year_range):
-    df = app.df_full.copy()
+    df = app.frames[(time_res, "raw")]
     start_year, end_year = year_range
-    df = df[(df["Date"].dt.year >= start_year) & (df["Date"].dt.year <= end_year)]
-
-    if time_res == "annual":
-        df = aggregate_annual(df)
+    df = df[df["Year"].between(start_year, end_year)]
 
-    # Define grouped categories
-    df["Fossil Fuels"] = df.get("Coal", 0) + df.get("GasDry", 0) + df.get("GasLiquid", 0)
-    df["Nuclear"] = df.get("Nuclear", 0)
-    df["Renewables"] = df.get("Solar", 0) + df.get("Wind", 0) + df.get("Biomass", 0)
-
-    grouped_df = df[["Date", "Fossil Fuels", "Nuclear", "Renewables"]]
+    # Define grouped categories in a new frame so the shared data is never written to
+    grouped_df = pd.DataFrame({
+        "Date": df["Date"],
+        "Fossil Fuels": df.get("Coal", 0) + df.get("GasDry", 0) + df.get("GasLiquid", 0),
+        "Nuclear": df.get("Nuclear", 0),
+        "Renewables": df.get("Solar", 0) + df.get("Wind", 0) + df.get("Biomass", 0)
+    })
 
     if view_type == "percent":
         totals = grouped_df[["Fossil Fuels", "Nuclear", "Renewables"]].sum(axis=1)
         for col in ["Fossil Fuels", "Nuclear", "Renewables"]:
             grouped_df[col] = grouped_df[col] / totals * 100
 
-    fig = go.Figure()
-    for col in ["Fossil Fuels", "Nuclear", "Renewables"]:
-        fig.add_trace(go.Scatter(
-            x=grouped_df["Date"],
-            y=grouped_df[col],
+    x = grouped_df["Date"].to_numpy()
+    traces = [
+        go.Scatter(
+            x=x,
+            y=grouped_df[col].to_numpy(),
             mode="lines",
             name=col,
             line=dict(width=3),
             hovertemplate=f"{col}: %{{y:.2f}}{'%' if view_type == 'percent' else ''}<extra></extra>"
-        ))
-
-    fig.update_layout(
-        #title=f"{'Annual' if time_res == 'annual' else 'Monthly'} Grouped Energy Production ({'%' if view_type == 'percent' else 'Quadrillion Btu'})",
-        title_font=dict(size=26, family="Roboto", color="#333"),
-        yaxis_title="% of Mix" if view_type == "percent" else "Quadrillion Btu",
-        xaxis_title="Date",
-        plot_bgcolor="#ffffff",
-        paper_bgcolor="#ffffff",
-        margin=dict(t=40, b=40, l=60, r=20),
-        legend=dict(
-            font=dict(size=13),
-            bgcolor="rgba(255,255,255,0.8)",
-            bordercolor="lightgray",
-            borderwidth=1
-        ),
-        hovermode="x unified",
-        xaxis=dict(
-            title_font=dict(size=26, family="Roboto", color="#333"),
-            tickfont=dict(size=14, family="Roboto")
-        ),
-        yaxis=dict(
-            title_font=dict(size=26, family="Roboto", color="#333"),
-            tickfont=dict(size=14, family="Roboto")
         )
-    )
+        for col in ["Fossil Fuels", "Nuclear", "Renewables"]
+    ]
+    fig = go.Figure(data=traces, layout=GROUPED_LAYOUTS[view_type])
     return fig
 
 # ========================================================================================== 